@@ -2,15 +2,51 @@ import sys
 import signal
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QPushButton,
-    QColorDialog, QSlider, QHBoxLayout, QGraphicsDropShadowEffect
+    QColorDialog, QSlider, QHBoxLayout
 )
-from PyQt6.QtGui import QFont, QColor, QKeyEvent, QPainter, QPen, QMouseEvent, QAction
-from PyQt6.QtCore import Qt, QPoint, pyqtSignal, QEvent, QTimer
+from PyQt6.QtGui import (
+    QFont, QColor, QKeyEvent, QPainter, QPen, QMouseEvent, QAction,
+    QStaticText, QTransform, QFontMetricsF
+)
+from PyQt6.QtCore import Qt, QPoint, QPointF, QRect, QSize, pyqtSignal, QEvent, QTimer
+
+# Enum lookups hoisted out of the per-event key filter
+EV_KEY_PRESS = QEvent.Type.KeyPress
+K_UP = Qt.Key.Key_Up
+K_DOWN = Qt.Key.Key_Down
+K_LEFT = Qt.Key.Key_Left
+K_RIGHT = Qt.Key.Key_Right
+K_ESCAPE = Qt.Key.Key_Escape
+K_BACKSPACE = Qt.Key.Key_Backspace
+K_RETURN = Qt.Key.Key_Return
+K_ENTER = Qt.Key.Key_Enter
+MOD_SHIFT = Qt.KeyboardModifier.ShiftModifier
+MOD_CTRL = Qt.KeyboardModifier.ControlModifier
+
+def _make_static_text(text, font):
+    static = QStaticText(text)
+    static.setTextFormat(Qt.TextFormat.PlainText)
+    static.prepare(QTransform(), font)
+    return static
+
+def _is_printable(text):
+    # Fast path for the common single ASCII character keystroke
+    if len(text) == 1:
+        return 0x20 <= ord(text) < 0x7f or text.isprintable()
+    return text.isprintable()
 
 # --- 1. THE FLOATING TEXT WIDGET ---
 class FloatingText(QWidget):
     activated = pyqtSignal(object)
 
+    # Arrow key -> nudge offset, looked up once per key press
+    _ARROWS = {
+        K_UP: QPoint(0, -2),
+        K_DOWN: QPoint(0, 2),
+        K_LEFT: QPoint(-2, 0),
+        K_RIGHT: QPoint(2, 0),
+    }
+
     def __init__(self, manager_ref, start_pos):
         super().__init__()
         self.manager = manager_ref
@@ -30,82 +66,207 @@ class FloatingText(QWidget):
         self._shadow_enabled = True
         self.is_selected = True
 
-        # UI
-        self.label = QLabel(self)
-        # CRITICAL FIX: This line ensures clicks pass through the text letters 
-        # to the window below, guaranteeing dragging always works.
-        self.label.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        # Cached render resources, rebuilt only when their inputs change
+        self._cached_font = QFont("Arial", self._font_size)
+        self._cached_font.setBold(True)
+        self._cached_font_size = self._font_size
+        self._cached_col_key = None
+        self._text_pen = QPen(self._color)
+        self._static_key = None
+        self._static_lines = []
+        self._caret = _make_static_text("|", self._cached_font)
+        self._line_height = QFontMetricsF(self._cached_font).lineSpacing()
+        self._last_size = QSize()
+        self._last_state = None
+        # Text and its shadow are painted directly in paintEvent (no child
+        # widget), so every click on the window starts a drag.
+        self._shadow_pen = QPen(QColor(0, 0, 0, 140))
+        self._selection_pen = QPen(QColor(0, 120, 255))
+        self._selection_pen.setWidth(2)
+        self._selection_pen.setStyle(Qt.PenStyle.DashLine)
+        self._selection_rect = QRect()
         
         self.move(start_pos)
         self.show()
 
         # Dragging state
         self._dragging = False
-        self._drag_offset = QPoint()
+        self._drag_offset = QPointF()
+        self._last_drag_pos = QPointF()
+        # Mouse drags apply only the latest position, at most once per frame
+        self._pending_drag_pos = None
+        self._drag_timer = QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.setInterval(16)
+        self._drag_timer.timeout.connect(self._flush_drag)
 
         # Cursor Blinking
         self.show_cursor = True
         self.cursor_timer = QTimer(self)
         self.cursor_timer.timeout.connect(self._blink_cursor)
-        self.cursor_timer.start(500) 
+        # Started/stopped by ControlBar.set_active_widget on (de)selection
+
+        # Update throttling: bursts of key events (autorepeat, fast typing)
+        # are coalesced into a single redraw per frame (~16 ms).
+        self._update_pending = False
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(16)
+        self._update_timer.timeout.connect(self._flush_update)
+
+        # Arrow-key nudges are accumulated and applied once per frame
+        self._pending_move = QPoint()
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.setInterval(16)
+        self._move_timer.timeout.connect(self._flush_move)
+
+        self.update_appearance()
+
+    # --- TEXT BUFFER ---
+    # Edits append/pop on a character list; the joined string is cached
+    # until the next edit. The placeholder is tracked by a flag so edits
+    # never need the joined string.
+    @property
+    def text_content(self):
+        if self._text_cache is None:
+            self._text_cache = "".join(self._chars)
+        return self._text_cache
+
+    @text_content.setter
+    def text_content(self, value):
+        self._chars = list(value)
+        self._text_cache = value
+        self._is_placeholder = value == "Type..."
+
+    def _mark_edited(self):
+        self._text_cache = None
+        self._is_placeholder = False
+
+    def _insert_text(self, text):
+        if self._is_placeholder: self._chars.clear()
+        self._chars.extend(text)
+        self._mark_edited()
+
+    def _schedule_update(self):
+        if not self._update_pending:
+            self._update_pending = True
+            self._update_timer.start()
+
+    def _flush_update(self):
+        if self._update_pending:
+            self._update_pending = False
+            self.update_appearance()
 
+    def _schedule_move(self, delta):
+        self._pending_move += delta
+        if not self._move_timer.isActive():
+            self._move_timer.start()
+
+    def _flush_move(self):
+        if not self._pending_move.isNull():
+            self.move(self.pos() + self._pending_move)
+            self._pending_move = QPoint()
+
+    def set_font_size(self, size):
+        if size == self._font_size:
+            return
+        self._font_size = size
+        self._cached_font_size = None
         self.update_appearance()
 
     def _blink_cursor(self):
         if self.is_selected:
             self.show_cursor = not self.show_cursor
-            self.update_appearance()
+            # Only the caret flips; the window is already sized for it
+            self.update()
 
     def update_appearance(self):
-        # 1. Update Font
-        font = QFont("Arial", self._font_size)
-        font.setBold(True)
-        self.label.setFont(font)
+        # Nothing visible changed since the last call -> skip the repaint.
+        # The caret state is left out: blinking repaints on its own.
+        state = (self.text_content, self._is_placeholder, self._font_size,
+                 self._color.rgba(), self._shadow_enabled, self.is_selected)
+        if state == self._last_state:
+            return
+        self._last_state = state
+
+        # 1. Update Font (only rebuilt when the size changes)
+        if self._cached_font_size != self._font_size:
+            self._cached_font = QFont("Arial", self._font_size)
+            self._cached_font.setBold(True)
+            self._cached_font_size = self._font_size
+            self._caret = _make_static_text("|", self._cached_font)
+            self._line_height = QFontMetricsF(self._cached_font).lineSpacing()
 
         # 2. Prepare Text
-        safe_text = self.text_content.replace("\n", "<br>")
-        
-        # Determine Color
-        if not safe_text or self.text_content == "Type...":
-            display_text = "Type..."
-            c = QColor(self._color)
-            c.setAlpha(150) 
-            col_str = c.name(QColor.NameFormat.HexArgb)
-        else:
-            display_text = safe_text
-            col_str = self._color.name()
+        # Same placeholder state the editing keys use
+        is_placeholder = self._is_placeholder or not self._chars
+        display_text = "Type..." if is_placeholder else self.text_content
 
-        # 3. Add Visual Cursor if selected
-        if self.is_selected and self.show_cursor:
-            display_text += "|"
-
-        # 4. Render HTML
-        self.label.setText(f"<span style='color:{col_str};'>{display_text}</span>")
-        self.label.adjustSize()
+        # Determine Color (cached on rgba + placeholder state)
+        col_key = (self._color.rgba(), is_placeholder)
+        if col_key != self._cached_col_key:
+            c = QColor(self._color)
+            if is_placeholder:
+                c.setAlpha(150) 
+            self._text_pen = QPen(c)
+            self._cached_col_key = col_key
+
+        # 3. Lay out static text (one QStaticText per line, re-prepared only
+        # when the text or font changes)
+        static_key = (display_text, self._font_size)
+        if static_key != self._static_key:
+            self._static_lines = [
+                _make_static_text(line, self._cached_font)
+                for line in display_text.split("\n")
+            ]
+            self._static_key = static_key
+
+        # 4. Measure the text box, reserving room for the caret while
+        # selected so blinking never changes the geometry
+        widths = [line.size().width() for line in self._static_lines]
+        if self.is_selected:
+            widths[-1] += self._caret.size().width()
+        width = int(max(widths)) + 1
+        height = int(len(self._static_lines) * self._line_height) + 1
         
-        # 5. Update Shadow
-        if self._shadow_enabled:
-            shadow = QGraphicsDropShadowEffect(self)
-            shadow.setBlurRadius(15)
-            shadow.setOffset(10, 10)
-            shadow.setColor(QColor(0, 0, 0, 255))
-            self.label.setGraphicsEffect(shadow)
-        else:
-            self.label.setGraphicsEffect(None)
-
-        # 6. Resize window to fit label
-        self.resize(self.label.width() + 20, self.label.height() + 20)
-        self.label.move(10, 10)
+        # 5. Resize window to fit text, but only when the box grows or
+        # shrinks noticeably (resizes are expensive window-manager round-trips)
+        last = self._last_size
+        if (last.isEmpty() or width > last.width() or height > last.height()
+                or last.width() - width > 2 or last.height() - height > 2):
+            self._last_size = QSize(width, height)
+            self.resize(width + 20, height + 20)
         self.update() 
 
     def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setFont(self._cached_font)
+
+        # Shadow: a translucent black pass offset by (10, 10), then the text
+        if self._shadow_enabled:
+            painter.setPen(self._shadow_pen)
+            self._draw_text(painter, 20, 20)
+        painter.setPen(self._text_pen)
+        self._draw_text(painter, 10, 10)
+
         if self.is_selected:
-            painter = QPainter(self)
-            pen = QPen(QColor(0, 120, 255))
-            pen.setWidth(2)
-            pen.setStyle(Qt.PenStyle.DashLine)
-            painter.setPen(pen)
-            painter.drawRect(2, 2, self.width()-4, self.height()-4)
+            painter.setPen(self._selection_pen)
+            painter.drawRect(self._selection_rect)
+
+    def resizeEvent(self, event):
+        self._selection_rect = QRect(2, 2, self.width()-4, self.height()-4)
+        super().resizeEvent(event)
+
+    def _draw_text(self, painter, x, y):
+        line_height = self._line_height
+        for i, line in enumerate(self._static_lines):
+            painter.drawStaticText(QPointF(x, y + i * line_height), line)
+
+        if self.is_selected and self.show_cursor:
+            last = self._static_lines[-1]
+            caret_y = y + (len(self._static_lines) - 1) * line_height
+            painter.drawStaticText(QPointF(x + last.size().width(), caret_y), self._caret)
 
     # --- DRAGGING LOGIC ---
     def mousePressEvent(self, event):
@@ -113,22 +274,103 @@ class FloatingText(QWidget):
             self.activated.emit(self) 
             self._dragging = True
             # Capture where we clicked relative to the window top-left
-            self._drag_offset = event.pos()
+            self._drag_offset = event.position()
+            self._last_drag_pos = QPointF(self.pos())
 
     def mouseMoveEvent(self, event):
         if self._dragging:
-            # Calculate new position based on global mouse pos minus the offset
-            self.move(event.globalPosition().toPoint() - self._drag_offset)
+            # Calculate new position based on global mouse pos minus the offset,
+            # staying in floating point until the final move()
+            self._pending_drag_pos = event.globalPosition() - self._drag_offset
+            if not self._drag_timer.isActive():
+                self._drag_timer.start()
 
     def mouseReleaseEvent(self, event):
         self._dragging = False
+        # Land exactly on the last reported position
+        self._drag_timer.stop()
+        self._flush_drag()
+
+    def _flush_drag(self):
+        new_pos = self._pending_drag_pos
+        if new_pos is None:
+            return
+        self._pending_drag_pos = None
+        if (new_pos - self._last_drag_pos).manhattanLength() < 1:
+            return
+        self._last_drag_pos = new_pos
+        self.move(new_pos.toPoint())
+
+    # --- KEYBOARD LOGIC ---
+    # Installed as an event filter (on this widget and the control bar) only
+    # while this widget is active, so no Python code runs per Qt event
+    # otherwise.
+    def eventFilter(self, obj, event):
+        if event.type() != EV_KEY_PRESS:
+            return False
+
+        key = event.key()
+        
+        # 1. MOVEMENT (Arrow Keys)
+        delta = self._ARROWS.get(key)
+        if delta is not None:
+            self._schedule_move(delta)
+            return True
+
+        # 2. DESELECT / EDITING KEYS
+        handler = self._KEY_HANDLERS.get(key)
+        if handler is not None:
+            handler(self, event)
+            return True
+
+        # 3. TYPING
+        text = event.text()
+        if text and _is_printable(text):
+            # Prevent control characters from printing
+            if not (event.modifiers() & MOD_CTRL):
+                self._insert_text(text)
+                self._schedule_update()
+                return True
+             
+        # Unhandled keys (Tab, Alt, Ctrl shortcuts...) continue normally
+        return False
+
+    def _key_escape(self, event):
+        self.manager.set_active_widget(None)
+
+    def _key_backspace(self, event):
+        if self._is_placeholder: self._chars.clear()
+        elif self._chars: self._chars.pop()
+        self._mark_edited()
+        self._schedule_update()
+
+    def _key_return(self, event):
+        # If Shift is pressed -> Add new line
+        if event.modifiers() & MOD_SHIFT:
+            self._chars.append("\n")
+            self._mark_edited()
+            self._schedule_update()
+        else:
+            # If just Enter -> Finish editing (Deselect)
+            self.manager.set_active_widget(None)
+
+    # Non-printing key -> handler, looked up once per key press
+    _KEY_HANDLERS = {
+        K_ESCAPE: _key_escape,
+        K_BACKSPACE: _key_backspace,
+        K_RETURN: _key_return,
+        K_ENTER: _key_return,
+    }
 
 # --- 2. THE CONTROL BAR ---
 class ControlBar(QWidget):
     def __init__(self):
         super().__init__()
         self.active_text_widget = None
-        self.text_widgets = []
+        # Owning references: the text windows are unparented top-levels (so
+        # minimizing the bar leaves them on screen), and PyQt destroys a
+        # parentless widget once its last Python reference goes away.
+        self.text_widgets = set()
         self.init_ui()
 
     def init_ui(self):
@@ -170,6 +412,12 @@ class ControlBar(QWidget):
         layout.addWidget(self.btn_color)
         layout.addWidget(self.btn_shadow)
         layout.addWidget(self.btn_del)
+
+        # Controls never take keyboard focus, so key presses land on the bar
+        # itself where the active text's event filter picks them up
+        for control in (self.btn_add, self.slider_size, self.btn_color,
+                        self.btn_shadow, self.btn_del):
+            control.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         
         self.setLayout(layout)
         self.show()
@@ -178,19 +426,31 @@ class ControlBar(QWidget):
         pos = self.geometry().bottomLeft() + QPoint(20, 20)
         new_widget = FloatingText(self, pos)
         new_widget.activated.connect(self.set_active_widget)
-        self.text_widgets.append(new_widget)
+        self.text_widgets.add(new_widget)
         self.set_active_widget(new_widget)
 
     def set_active_widget(self, widget):
-        for w in self.text_widgets:
-            w.is_selected = False
-            w.update_appearance() 
+        # Only the previously-active and newly-active widgets change state
+        previous = self.active_text_widget
+        if previous is not None and previous is not widget:
+            previous.is_selected = False
+            previous.cursor_timer.stop()
+            previous.removeEventFilter(previous)
+            self.removeEventFilter(previous)
+            previous.update_appearance()
 
         self.active_text_widget = widget
         if widget:
             widget.is_selected = True
+            widget.show_cursor = True
+            widget.cursor_timer.start(500)
+            # Keys reach the text whether it or the control bar has focus
+            widget.installEventFilter(widget)
+            self.installEventFilter(widget)
             widget.raise_() 
             widget.update_appearance() 
+            # Show the reset caret even if update_appearance had nothing to do
+            widget.update()
             
             self.slider_size.blockSignals(True)
             self.slider_size.setValue(widget._font_size)
@@ -201,15 +461,19 @@ class ControlBar(QWidget):
             self.btn_shadow.blockSignals(False)
 
     def delete_current(self):
-        if self.active_text_widget:
-            self.active_text_widget.close()
-            self.text_widgets.remove(self.active_text_widget)
-            self.active_text_widget = None
+        widget = self.active_text_widget
+        if widget:
+            self.set_active_widget(None)
+            # Drop the connection and timer so nothing keeps the widget alive
+            widget.activated.disconnect()
+            widget.cursor_timer.stop()
+            widget.hide()
+            widget.deleteLater()
+            self.text_widgets.discard(widget)
 
     def on_size_change(self, val):
         if self.active_text_widget:
-            self.active_text_widget._font_size = val
-            self.active_text_widget.update_appearance()
+            self.active_text_widget.set_font_size(val)
 
     def on_color_click(self):
         if self.active_text_widget:
@@ -223,67 +487,10 @@ class ControlBar(QWidget):
             self.active_text_widget._shadow_enabled = self.btn_shadow.isChecked()
             self.active_text_widget.update_appearance()
 
-# --- 3. CUSTOM APP TO HANDLE GLOBAL KEYS ---
-class MyApplication(QApplication):
-    def __init__(self, argv):
-        super().__init__(argv)
-        self.control_bar = None
-
-    def notify(self, receiver, event):
-        if (event.type() == QEvent.Type.KeyPress and 
-            self.control_bar and 
-            self.control_bar.active_text_widget):
-            
-            key = event.key()
-            txt_widget = self.control_bar.active_text_widget
-            current_str = txt_widget.text_content
-            
-            # 1. MOVEMENT (Arrow Keys)
-            if key == Qt.Key.Key_Up:    txt_widget.move(txt_widget.pos() + QPoint(0, -2))
-            elif key == Qt.Key.Key_Down:  txt_widget.move(txt_widget.pos() + QPoint(0, 2))
-            elif key == Qt.Key.Key_Left:  txt_widget.move(txt_widget.pos() + QPoint(-2, 0))
-            elif key == Qt.Key.Key_Right: txt_widget.move(txt_widget.pos() + QPoint(2, 0))
-            
-            # 2. DESELECT
-            elif key == Qt.Key.Key_Escape:
-                self.control_bar.set_active_widget(None)
-                
-            # 3. TYPING
-            elif key == Qt.Key.Key_Backspace:
-                if current_str == "Type...": current_str = ""
-                else: current_str = current_str[:-1]
-                txt_widget.text_content = current_str
-                txt_widget.update_appearance()
-                
-            elif key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
-                # If Shift is pressed -> Add new line
-                if event.modifiers() & Qt.KeyboardModifier.ShiftModifier:
-                    txt_widget.text_content += "\n"
-                    txt_widget.update_appearance()
-                else:
-                    # If just Enter -> Finish editing (Deselect)
-                    self.control_bar.set_active_widget(None)
-                 
-            elif event.text() and event.text().isprintable():
-                if current_str == "Type...": current_str = ""
-                # Prevent control characters from printing
-                if not (event.modifiers() & Qt.KeyboardModifier.ControlModifier):
-                    txt_widget.text_content = current_str + event.text()
-                    txt_widget.update_appearance()
-
-            # Prevent buttons from triggering if we are typing
-            if isinstance(receiver, QPushButton):
-                 return super().notify(receiver, event)
-                 
-            return True # Consume event
-            
-        return super().notify(receiver, event)
-
 def main():
     signal.signal(signal.SIGINT, signal.SIG_DFL)
-    app = MyApplication(sys.argv)
+    app = QApplication(sys.argv)
     bar = ControlBar()
-    app.control_bar = bar 
     sys.exit(app.exec())
 
 if __name__ == "__main__":